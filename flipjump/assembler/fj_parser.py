@@ -1,12 +1,11 @@
+import re
 from os import path
+from sys import intern
 from pathlib import Path
-from typing import Set, List, Tuple, Dict, Union
+from typing import Set, List, Tuple, Dict, Union, Iterator
 
 import sly
 
-# noinspection PyProtectedMember
-from sly.lex import Token
-
 # noinspection PyProtectedMember
 from sly.yacc import YaccProduction as ParsedRule
 
@@ -74,7 +73,7 @@ def syntax_warning(line: int, is_error: bool, msg: str = '') -> None:
 # Regex for the parser
 
 id_re = r'[a-zA-Z_][a-zA-Z_0-9]*'
-dot_id_re = fr'(({id_re})|\.*)?(\.({id_re}))+'
+dot_id_re = fr'(?:{id_re}|\.*)?(?:\.{id_re})+'
 
 bin_num = r'0[bB][01]+'
 hex_num = r'0[xX][0-9a-fA-F]+'
@@ -98,8 +97,8 @@ char_escape_dict = {
 escape_chars = ''.join(k for k in char_escape_dict)
 char = fr'[ -~]|\\[{escape_chars}]|\\[xX][0-9a-fA-F]{{2}}'
 
-number_re = fr"({bin_num})|({hex_num})|('({char})')|({dec_num})"
-string_re = fr'"({char})*"'
+number_re = fr"{bin_num}|{hex_num}|'(?:{char})'|{dec_num}"
+string_re = fr'"(?:{char})*"'
 
 
 def get_char_value_and_length(s: str) -> Tuple[int, int]:
@@ -110,10 +109,72 @@ def get_char_value_and_length(s: str) -> Tuple[int, int]:
     return int(s[2:4], 16), 4
 
 
-# noinspection PyUnboundLocalVariable,PyRedeclaration,PyPep8Naming,PyMethodMayBeStatic
-class FJLexer(sly.Lexer):
-    # noinspection PyUnresolvedReferences
-    tokens = {NS, DEF, REP, WFLIP, PAD, SEGMENT, RESERVE, ID, DOT_ID, NUMBER, STRING, LE, GE, EQ, NEQ, SHL, SHR, NL, SC}
+class Token:
+    """
+    A lexed token, in the form the sly parser expects (type, value and position).
+    """
+
+    __slots__ = ('type', 'value', 'lineno', 'index', 'end')
+
+    def __init__(self, token_type: str, value: Union[str, int], lineno: int, index: int, end: int):
+        self.type = token_type
+        self.value = value
+        self.lineno = lineno
+        self.index = index
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f'Token(type={self.type!r}, value={self.value!r}, lineno={self.lineno}, index={self.index})'
+
+
+def get_number_value(n: str) -> int:
+    if len(n) >= 2:
+        if n[0] == "'":
+            return get_char_value_and_length(n[1:-1])[0]
+        if n[1] in 'xX':
+            return int(n, 16)
+        if n[1] in 'bB':
+            return int(n, 2)
+    return int(n)
+
+
+def get_string_value(string: str) -> int:
+    chars = []
+    s = string[1:-1]
+    i = 0
+    while i < len(s):
+        val, length = get_char_value_and_length(s[i:])
+        chars.append(val)
+        i += length
+    return sum(val << (i * 8) for i, val in enumerate(chars))
+
+
+class FJLexer:
+    """
+    Splits a .fj file text into tokens, using a single master regex (one alternative per token kind).
+    """
+
+    tokens = {
+        'NS',
+        'DEF',
+        'REP',
+        'WFLIP',
+        'PAD',
+        'SEGMENT',
+        'RESERVE',
+        'ID',
+        'DOT_ID',
+        'NUMBER',
+        'STRING',
+        'LE',
+        'GE',
+        'EQ',
+        'NEQ',
+        'SHL',
+        'SHR',
+        'NL',
+        'SC',
+    }
 
     literals = {
         '=',
@@ -140,93 +201,83 @@ class FJLexer(sly.Lexer):
         ",",
     }
 
-    ignore_ending_comment = r'//.*'
-    ignore_line_continuation = r'\\[ \t]*\n'
-
-    # Tokens
-    DOT_ID = dot_id_re
-    ID = id_re
-    NUMBER = number_re
-    STRING = string_re
-
-    # noinspection PyUnresolvedReferences
-    ID[r'def'] = DEF
-    # noinspection PyUnresolvedReferences
-    ID[r'rep'] = REP
-    # noinspection PyUnresolvedReferences
-    ID[r'ns'] = NS
-
-    # noinspection PyUnresolvedReferences
-    ID[r'wflip'] = WFLIP
-    # noinspection PyUnresolvedReferences
-    ID[r'pad'] = PAD
+    keywords = {
+        'def': 'DEF',
+        'rep': 'REP',
+        'ns': 'NS',
+        'wflip': 'WFLIP',
+        'pad': 'PAD',
+        'segment': 'SEGMENT',
+        'reserve': 'RESERVE',
+    }
 
-    # noinspection PyUnresolvedReferences
-    ID[r'segment'] = SEGMENT
-    # noinspection PyUnresolvedReferences
-    ID[r'reserve'] = RESERVE
-
-    LE = "<="
-    GE = ">="
-
-    EQ = "=="
-    NEQ = "!="
-
-    SHL = r'<<'
-    SHR = r'>>'
-
-    # Punctuations
-    NL = r'[\r\n]'
-    SC = r';'
-
-    ignore = ' \t'
-
-    # noinspection PyTypeChecker
-    def NUMBER(self, t: Token) -> Token:
-        n = t.value
-        if len(n) >= 2:
-            # noinspection PyUnresolvedReferences
-            if n[0] == "'":
-                t.value = get_char_value_and_length(n[1:-1])[0]
-            elif n[1] in 'xX':
-                t.value = int(n, 16)
-            elif n[1] in 'bB':
-                t.value = int(n, 2)
+    # (name, regex) in priority order:
+    #  multi-char operators, strings and comments must come before the literals they start with,
+    #  and DOT_ID must come before ID. spaces and tabs before every token are skipped.
+    token_specs: List[Tuple[str, str]] = [
+        ('NL', r'[\r\n]'),
+        ('ignore_ending_comment', r'//.*'),
+        ('ignore_line_continuation', r'\\[ \t]*\n'),
+        ('LE', r'<='),
+        ('GE', r'>='),
+        ('EQ', r'=='),
+        ('NEQ', r'!='),
+        ('SHL', r'<<'),
+        ('SHR', r'>>'),
+        ('STRING', string_re),
+        ('literal', f"[{re.escape(''.join(sorted(literals)))}]"),
+        ('DOT_ID', dot_id_re),
+        ('ID', id_re),
+        ('NUMBER', number_re),
+        ('SC', r';'),
+        ('error', r'[^ \t\n]'),
+    ]
+    master_re = re.compile('[ \t]*(?:' + '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specs) + ')')
+
+    def tokenize(self, text: str) -> Iterator[Token]:
+        """
+        @param text: the .fj file content
+        @return: generator of the file's tokens
+        """
+        keywords = self.keywords
+        lineno = 1
+
+        for match in self.master_re.finditer(text):
+            kind: str = match.lastgroup  # type: ignore[assignment]
+            value = match[kind]
+            end = match.end()
+
+            if kind == 'ID':
+                yield Token(keywords.get(value, 'ID'), intern(value), lineno, end - len(value), end)
+            elif kind == 'NL':
+                yield Token('NL', value, lineno, end - 1, end)
+                lineno += 1
+            elif kind == 'literal':
+                yield Token(value, value, lineno, end - 1, end)
+            elif kind == 'NUMBER':
+                yield Token('NUMBER', get_number_value(value), lineno, end - len(value), end)
+            elif kind == 'DOT_ID':
+                yield Token('DOT_ID', intern(value), lineno, end - len(value), end)
+            elif kind == 'STRING':
+                yield Token('STRING', get_string_value(value), lineno, end - len(value), end)
+            elif kind == 'ignore_ending_comment':
+                pass
+            elif kind == 'ignore_line_continuation':
+                lineno += 1
+            elif kind == 'error':
+                self.error(value, lineno)
             else:
-                t.value = int(n)
-        else:
-            t.value = int(t.value)
-        return t
-
-    def STRING(self, t: Token) -> Token:
-        chars = []
-        s = t.value[1:-1]
-        i = 0
-        while i < len(s):
-            val, length = get_char_value_and_length(s[i:])
-            chars.append(val)
-            i += length
-        t.value = sum(val << (i * 8) for i, val in enumerate(chars))
-        return t
-
-    def NL(self, t: Token) -> Token:
-        self.lineno += 1
-        return t
-
-    def ignore_line_continuation(self, t: Token) -> Token:
-        self.lineno += 1
-        return t
-
-    def error(self, t: Token) -> None:
+                yield Token(kind, value, lineno, end - len(value), end)
+
+    @staticmethod
+    def error(char: str, lineno: int) -> None:
         global error_occurred, all_errors
         error_occurred = True
 
-        error_string = f"Lexing Error in {get_position(self.lineno)}: {t.value[0]}"
+        error_string = f"Lexing Error in {get_position(lineno)}: {char}"
         all_errors += f"{error_string}\n"
         print(error_string)
 
-        self.index += 1
-
 
 def next_address() -> Expr:
     return Expr('$')
@@ -263,6 +314,12 @@ class FJParser(sly.Parser):
             INITIAL_MACRO_NAME: Macro([], [], [], '', _get_main_macro_code_position(first_file))
         }
 
+        # the names memoization, keyed by the current namespace name.
+        # _ns_prefixes[i] is the name of the i-th depth of the current namespace ('' is the global namespace).
+        self._ns_prefixes: List[str] = ['']
+        self._dot_id_full_name_cache: Dict[Tuple[str, str], str] = {}
+        self._base_name_cache: Dict[str, str] = {}
+
     def validate_free_macro_name(self, name: MacroName, lineno: int) -> None:
         if name in self.macros:
             syntax_error(
@@ -294,14 +351,20 @@ class FJParser(sly.Parser):
         lineno: int,
         macro_name: MacroName,
     ) -> None:
+        if not (labels_used or labels_declared or regular_labels or extern_labels or global_labels):
+            return
+
         self.validate_labels_groups(extern_labels, global_labels, regular_labels, lineno, macro_name)
 
-        self.validate_no_unused_labels(regular_labels, global_labels, labels_declared, labels_used, lineno, macro_name)
+        declared_base_names = {self.to_base_name(label) for label in labels_declared}
+        self.validate_no_unused_labels(
+            regular_labels, global_labels, declared_base_names, labels_used, lineno, macro_name
+        )
         self.validate_no_unknown_label_uses(
             regular_labels, global_labels, labels_declared, labels_used, lineno, macro_name
         )
         self.validate_no_bad_label_declarations(regular_labels, extern_labels, labels_declared, lineno, macro_name)
-        self.validate_all_extern_labels_are_declared(extern_labels, labels_declared, lineno, macro_name)
+        self.validate_all_extern_labels_are_declared(extern_labels, declared_base_names, lineno, macro_name)
 
     @staticmethod
     def validate_labels_groups(
@@ -330,14 +393,12 @@ class FJParser(sly.Parser):
         self,
         regular_labels: Set[str],
         global_labels: Set[str],
-        labels_declared: Set[str],
+        declared_base_names: Set[str],
         labels_used: Set[str],
         lineno: int,
         macro_name: MacroName,
     ) -> None:
-        unused_labels = regular_labels.union(global_labels) - labels_used.union(
-            self.to_base_name(label) for label in labels_declared
-        )
+        unused_labels = regular_labels.union(global_labels).difference(labels_used, declared_base_names)
         if unused_labels:
             syntax_warning(
                 lineno,
@@ -346,9 +407,9 @@ class FJParser(sly.Parser):
             )
 
     def validate_all_extern_labels_are_declared(
-        self, extern_labels: Set[str], labels_declared: Set[str], lineno: int, macro_name: MacroName
+        self, extern_labels: Set[str], declared_base_names: Set[str], lineno: int, macro_name: MacroName
     ) -> None:
-        unused_labels = extern_labels - {self.to_base_name(label) for label in labels_declared}
+        unused_labels = extern_labels - declared_base_names
         if unused_labels:
             syntax_warning(
                 lineno,
@@ -364,8 +425,11 @@ class FJParser(sly.Parser):
         lineno: int,
         macro_name: MacroName,
     ) -> None:
-        bad_declarations = labels_declared - set(
-            self.ns_full_name(label) for label in extern_labels.union(regular_labels)
+        if not labels_declared:
+            return
+
+        bad_declarations = labels_declared.difference(
+            [self.ns_full_name(label) for label in extern_labels.union(regular_labels)]
         )
         if bad_declarations:
             syntax_warning(
@@ -383,7 +447,7 @@ class FJParser(sly.Parser):
         lineno: int,
         macro_name: MacroName,
     ) -> None:
-        bad_uses = labels_used - global_labels - regular_labels - set(labels_declared) - {'$'}
+        bad_uses = labels_used.difference(global_labels, regular_labels, labels_declared, ('$',))
         if bad_uses:
             syntax_warning(
                 lineno,
@@ -426,16 +490,38 @@ class FJParser(sly.Parser):
 
         self.validate_no_segment_or_reserve(ops, name)
 
-    @staticmethod
-    def ns_name() -> str:
-        return '.'.join(curr_namespace)
+    def reset_namespace(self) -> None:
+        """
+        start parsing a new file, from the global namespace.
+        """
+        global curr_namespace
+        curr_namespace = []
+        self._ns_prefixes = ['']
 
     @staticmethod
-    def ns_full_name(base_name: str) -> str:
-        return '.'.join(curr_namespace + [base_name])
+    def _join_ns(ns_prefix: str, name: str) -> str:
+        return intern(f'{ns_prefix}.{name}') if ns_prefix else name
+
+    def enter_namespace(self, namespace: str) -> None:
+        curr_namespace.append(namespace)
+        self._ns_prefixes.append(self._join_ns(self._ns_prefixes[-1], namespace))
+
+    def exit_namespace(self) -> None:
+        curr_namespace.pop()
+        self._ns_prefixes.pop()
+
+    def ns_name(self) -> str:
+        return self._ns_prefixes[-1]
+
+    def ns_full_name(self, base_name: str) -> str:
+        return self._join_ns(self._ns_prefixes[-1], base_name)
+
+    def base_name_to_ns_full_name(self, base_name: str, lineno: int) -> str:
+        key = (self._ns_prefixes[-1], base_name)
+        full_name = self._dot_id_full_name_cache.get(key)
+        if full_name is not None:
+            return full_name
 
-    @staticmethod
-    def base_name_to_ns_full_name(base_name: str, lineno: int) -> str:
         without_dots = base_name.lstrip('.')
         if len(without_dots) == len(base_name):
             return base_name
@@ -446,12 +532,18 @@ class FJParser(sly.Parser):
                 lineno,
                 f'Used more leading dots than current namespace depth ' f'({num_of_dots}-1 > {len(curr_namespace)})',
             )
+            return without_dots
 
-        return '.'.join(curr_namespace[: len(curr_namespace) - (num_of_dots - 1)] + [without_dots])
+        full_name = self._dot_id_full_name_cache[key] = self._join_ns(
+            self._ns_prefixes[len(curr_namespace) - (num_of_dots - 1)], without_dots
+        )
+        return full_name
 
-    @staticmethod
-    def to_base_name(name: str) -> str:
-        return name.split('.')[-1]
+    def to_base_name(self, name: str) -> str:
+        base_name = self._base_name_cache.get(name)
+        if base_name is None:
+            base_name = self._base_name_cache[name] = intern(name.rpartition('.')[2])
+        return base_name
 
     def error(self, token: Token) -> None:
         global error_occurred, all_errors
@@ -502,11 +594,11 @@ class FJParser(sly.Parser):
 
     @_('NS ID')
     def namespace(self, p: ParsedRule) -> None:
-        curr_namespace.append(p.ID)
+        self.enter_namespace(p.ID)
 
     @_('namespace "{" NL definable_line_statements NL "}"')
     def definable_line_statement(self, p: ParsedRule) -> List[Op]:
-        curr_namespace.pop()
+        self.exit_namespace()
         return p.definable_line_statements
 
     @_('DEF ID macro_params "{" NL line_statements NL "}"')
@@ -558,7 +650,8 @@ class FJParser(sly.Parser):
 
     @_('IDs "," ID')
     def IDs(self, p: ParsedRule) -> List[str]:
-        return p.IDs + [p.ID]
+        p.IDs.append(p.ID)
+        return p.IDs
 
     @_('ID')
     def IDs(self, p: ParsedRule) -> List[str]:
@@ -627,7 +720,8 @@ class FJParser(sly.Parser):
 
     @_('ids "," id')
     def ids(self, p: ParsedRule) -> List[str]:
-        return p.ids + [p.id[0]]
+        p.ids.append(p.id[0])
+        return p.ids
 
     @_('id')
     def ids(self, p: ParsedRule) -> List[str]:
@@ -661,6 +755,11 @@ class FJParser(sly.Parser):
         if name in self.consts:
             syntax_error(p.lineno, f'Can\'t redeclare the variable "{name}".')
 
+        if p.expr.is_int():
+            # already folded while parsing (Expr objects are never modified, so it can be shared).
+            self.consts[name] = p.expr
+            return
+
         evaluated = p.expr.eval_new(self.consts)
         try:
             self.consts[name] = Expr(int(evaluated))
@@ -689,7 +788,8 @@ class FJParser(sly.Parser):
 
     @_('expressions "," expr')
     def expressions(self, p: ParsedRule) -> List[Expr]:
-        return p.expressions + [p.expr]
+        p.expressions.append(p.expr)
+        return p.expressions
 
     @_('expr')
     def expressions(self, p: ParsedRule) -> List[Expr]:
@@ -818,9 +918,9 @@ def validate_current_file(files_seen: Set[Union[str, Path]]) -> None:
 
 
 def lex_parse_curr_file(lexer: FJLexer, parser: FJParser) -> None:
-    global curr_text, curr_namespace
-    curr_text = curr_file.open('r').read()
-    curr_namespace = []
+    global curr_text
+    curr_text = curr_file.read_text(encoding='utf-8')
+    parser.reset_namespace()
 
     lex_res = lexer.tokenize(curr_text)
     exit_if_errors()
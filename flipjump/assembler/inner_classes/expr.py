@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from operator import mul, add, sub, floordiv, lshift, rshift, mod, xor, or_, and_
-from typing import Union, Tuple, Set, Dict, Callable
+from typing import Union, Tuple, Set, FrozenSet, Dict, Callable, Optional
 
 from flipjump.utils.exceptions import FlipJumpExprException
 
@@ -38,8 +38,11 @@ class Expr:
     The python representation of a .fj expression (from labels, consts and math-ops)
     """
 
+    __slots__ = ('value', '_labels')
+
     def __init__(self, expr: Union[int, str, Tuple[str, Tuple[Expr, ...]]]):
         self.value = expr
+        self._labels: Optional[FrozenSet[str]] = None  # lazily computed by _get_labels()
 
     def is_int(self) -> bool:
         return isinstance(self.value, int)
@@ -49,15 +52,25 @@ class Expr:
             return self.value  # type: ignore[return-value]
         raise FlipJumpExprException(f"Can't resolve labels:  {', '.join(self.all_unknown_labels())}")
 
+    def _get_labels(self) -> FrozenSet[str]:
+        """
+        @return: all labels used (recursively) in this expression (cached, as Expr objects are never modified).
+        """
+        if self._labels is None:
+            value = self.value
+            if isinstance(value, int):
+                self._labels = frozenset()
+            elif isinstance(value, str):
+                self._labels = frozenset((value,))
+            else:
+                self._labels = frozenset().union(*[expr._get_labels() for expr in value[1]])
+        return self._labels
+
     def all_unknown_labels(self) -> Set[str]:
         """
         @return: all labels used (recursively) in this expression.
         """
-        if isinstance(self.value, int):
-            return set()
-        if isinstance(self.value, str):
-            return {self.value}
-        return set(label for expr in self.value[1] for label in expr.all_unknown_labels())
+        return set(self._get_labels())
 
     def eval_new(self, params_dict: Dict[str, Expr]) -> Expr:
         """
@@ -65,21 +78,27 @@ class Expr:
         replaces every string it can with its dictionary value, and evaluates any op it can.
         @param params_dict: the label->ExprValue dictionary to be used
         @raise FlipJumpExprException if math op failed
-        @return: the new Expr
+        @return: the new Expr (an expression that params_dict doesn't change returns itself,
+         as Expr objects are never modified)
         """
-        if isinstance(self.value, int):
-            return Expr(self.value)
-
-        if isinstance(self.value, str):
-            if self.value in params_dict:
-                return params_dict[self.value].eval_new({})
-            return Expr(self.value)
-
-        op, args = self.value
-        evaluated_args: Tuple[Expr, ...] = tuple(e.eval_new(params_dict) for e in args)
-        if all(isinstance(e.value, int) for e in evaluated_args):
+        value = self.value
+        if isinstance(value, int):
+            return self
+
+        if isinstance(value, str):
+            if value in params_dict:
+                return params_dict[value].eval_new({})
+            return self
+
+        if params_dict.keys().isdisjoint(self._get_labels()):  # iterates the smaller of the two
+            return self
+
+        op, args = value
+        evaluated_args: Tuple[Expr, ...] = tuple([arg.eval_new(params_dict) for arg in args])
+        evaluated_values = [arg.value for arg in evaluated_args]
+        if all([isinstance(evaluated_value, int) for evaluated_value in evaluated_values]):
             try:
-                return Expr(op_string_to_function[op](*(arg.value for arg in evaluated_args)))  # type: ignore[arg-type]
+                return Expr(op_string_to_function[op](*evaluated_values))  # type: ignore[arg-type]
             except Exception as e:
                 raise FlipJumpExprException(f'{repr(e)}. bad math operation ({op}): {str(self)}.')
         return Expr((op, evaluated_args))
@@ -91,16 +110,17 @@ class Expr:
         @raise FlipJumpExprException if it can't evaluate
         @return: the integer-value of the expression
         """
-        if isinstance(self.value, int):
-            return self.value
+        value = self.value
+        if isinstance(value, int):
+            return value
 
-        if isinstance(self.value, str):
-            if self.value in labels:
-                return labels[self.value]
-            raise FlipJumpExprException(f"Can't evaluate label {self.value} in expression {self}")
+        if isinstance(value, str):
+            if value in labels:
+                return labels[value]
+            raise FlipJumpExprException(f"Can't evaluate label {value} in expression {self}")
 
-        op, args = self.value
-        evaluated_args: Tuple[int, ...] = tuple(e.exact_eval(labels) for e in args)
+        op, args = value
+        evaluated_args = [arg.exact_eval(labels) for arg in args]
         try:
             return op_string_to_function[op](*evaluated_args)
         except Exception as e:
@@ -135,7 +155,8 @@ def get_minimized_expr(op: str, params: Tuple[Expr, ...]) -> Expr:
     @param params: the op parameters
     @return: the expression
     """
-    if all(param.is_int() for param in params):
-        return Expr(op_string_to_function[op](*map(int, params)))
+    values = tuple(param.value for param in params)
+    if all(isinstance(value, int) for value in values):
+        return Expr(op_string_to_function[op](*values))  # type: ignore[arg-type]
     else:
         return Expr((op, params))
@@ -3,6 +3,7 @@ from __future__ import annotations
 import dataclasses
 import os
 from dataclasses import dataclass
+from sys import intern
 from typing import Union, Dict, Set, List, Tuple, Any
 
 from flipjump.utils.exceptions import FlipJumpExprException
@@ -15,6 +16,8 @@ class CodePosition:
     A position in the .fj files.
     """
 
+    __slots__ = ('file', 'file_short_name', 'line')
+
     file: str
     file_short_name: str  # shortened file name. usually s1,s2,... for stl, and f1,f2,... for the rest.
     line: int
@@ -34,8 +37,10 @@ class MacroName:
     Unique for every macro definition.
     """
 
+    __slots__ = ('name', 'parameter_num')
+
     def __init__(self, name: str, parameter_num: int = 0):
-        self.name = name
+        self.name = intern(name)
         self.parameter_num = parameter_num
 
     def __str__(self) -> str:
@@ -67,6 +72,8 @@ class FlipJump:
     The python representation of the "flip; jump" fj-assembly op.
     """
 
+    __slots__ = ('flip', 'jump', 'code_position')
+
     def __init__(self, flip: Expr, jump: Expr, code_position: CodePosition):
         self.flip = flip
         self.jump = jump
@@ -93,6 +100,8 @@ class WordFlip:
     The python representation of the "wflip address, value [, return_address]" fj-assembly op.
     """
 
+    __slots__ = ('word_address', 'flip_value', 'return_address', 'code_position')
+
     def __init__(self, word_address: Expr, flip_value: Expr, return_address: Expr, code_position: CodePosition):
         self.word_address = word_address
         self.flip_value = flip_value
@@ -307,8 +316,10 @@ class Label:
     The python representation of the "label:" fj-assembly op.
     """
 
+    __slots__ = ('name', 'code_position')
+
     def __init__(self, name: str, code_position: CodePosition):
-        self.name = name
+        self.name = intern(name)
         self.code_position = code_position
 
     def __str__(self) -> str:
@@ -1,4 +1,6 @@
 import lzma
+import struct
+from array import array
 from enum import Enum
 from typing import List, Dict
 
@@ -38,6 +40,15 @@ _header_extension_size = 8 + 4
 _segment_format = '<QQQQ'
 _segment_size = 8 + 8 + 8 + 8
 
+# precompiled, so the formats won't be parsed on every pack/unpack.
+_header_base_struct = struct.Struct(_header_base_format)
+_header_extension_struct = struct.Struct(_header_extension_format)
+_segment_struct = struct.Struct(_segment_format)
+
+
+# memory-width -> the typecode of a (native-endian) array.array of words of that width.
+_word_array_typecodes: Dict[int, str] = {array(typecode).itemsize * 8: typecode for typecode in 'QLIHB'}
+
 
 class FJMVersion(Enum):
     BaseVersion = 0  # initial version, minimal structure
@@ -1,26 +1,30 @@
 import dataclasses
 import lzma
+import mmap
 import struct
+import sys
+from array import array
+from bisect import bisect_right
 from collections import defaultdict
 from enum import IntEnum
 from pathlib import Path
-from struct import unpack
 from time import sleep
-from typing import BinaryIO, List, Tuple, Dict
+from typing import List, Tuple, Dict, Union, Optional
 
 from flipjump.fjm.fjm_consts import (
     FJ_MAGIC,
     _reserved_dict_threshold,
-    _header_base_format,
-    _header_extension_format,
+    _header_base_struct,
+    _header_extension_struct,
     _header_base_size,
     _header_extension_size,
-    _segment_format,
+    _segment_struct,
     _segment_size,
     SUPPORTED_VERSIONS_NAMES,
     _LZMA_FORMAT,
     _LZMA_DECOMPRESSION_FILTERS,
     _new_garbage_val,
+    _word_array_typecodes,
     FJMVersion,
 )
 from flipjump.utils.exceptions import FlipJumpReadFjmException, FlipJumpRuntimeMemoryException
@@ -56,9 +60,16 @@ class Reader:
     magic: int
     memory_width: int
     version: FJMVersion
+    _word_mask: int
+    _bit_offset_mask: int
+    _word_address_shift: int
     segment_num: int
-    memory: Dict[int, int]
+    region_starts: List[int]
+    regions: List["array[int]"]
+    sparse_memory: Dict[int, int]
+    op_locations: Dict[int, Tuple["array[int]", int]]
     zeros_boundaries: List[Tuple[int, int]]
+    zeros_boundaries_starts: List[int]
 
     def __init__(self, input_file: Path, *, garbage_handling: GarbageHandling = GarbageHandling.Stop):
         """
@@ -68,29 +79,52 @@ class Reader:
         """
         self.garbage_handling = garbage_handling
 
+        bad_file_message = f"Bad file {input_file}, can't unpack. Maybe it's not a .fjm file?"
         try:
             with open(input_file, 'rb') as fjm_file:
-                self._init_header_fields(fjm_file)
+                try:
+                    fjm_mapping = mmap.mmap(fjm_file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError as ve:  # an empty file can't be mapped
+                    raise FlipJumpReadFjmException(bad_file_message) from ve
+
+            with fjm_mapping:
+                segments_table_offset = self._init_header_fields(fjm_mapping)
                 self._validate_header()
-                segments = self._init_segments(fjm_file)
-                data = self._read_decompressed_data(fjm_file)
-                self._init_memory(segments, data)
+                segments, data_offset = self._init_segments(fjm_mapping, segments_table_offset)
+                data = self._read_decompressed_data(fjm_mapping, data_offset)
+            self._init_memory(segments, data)
         except struct.error as se:
-            exception_message = f"Bad file {input_file}, can't unpack. Maybe it's not a .fjm file?"
-            raise FlipJumpReadFjmException(exception_message) from se
+            raise FlipJumpReadFjmException(bad_file_message) from se
 
-    def _init_header_fields(self, fjm_file: BinaryIO) -> None:
-        self.magic, self.memory_width, version, self.segment_num = unpack(
-            _header_base_format, fjm_file.read(_header_base_size)
-        )
+    def _init_header_fields(self, fjm_mapping: mmap.mmap) -> int:
+        """
+        @param fjm_mapping: [in]: the mapped .fjm file.
+        @return: the offset of the segments table (the headers size).
+        """
+        self.magic, self.memory_width, version, self.segment_num = _header_base_struct.unpack_from(fjm_mapping, 0)
+        self._word_mask = (1 << self.memory_width) - 1
+        self._bit_offset_mask = self.memory_width - 1
+        self._word_address_shift = self.memory_width.bit_length() - 1
         self.version = FJMVersion(version)
         if FJMVersion.BaseVersion == self.version:
             self.flags, self.reserved = 0, 0
-        else:
-            self.flags, self.reserved = unpack(_header_extension_format, fjm_file.read(_header_extension_size))
+            return _header_base_size
 
-    def _init_segments(self, fjm_file: BinaryIO) -> List[Tuple[int, int, int, int]]:
-        return [unpack(_segment_format, fjm_file.read(_segment_size)) for _ in range(self.segment_num)]
+        self.flags, self.reserved = _header_extension_struct.unpack_from(fjm_mapping, _header_base_size)
+        return _header_base_size + _header_extension_size
+
+    def _init_segments(
+        self, fjm_mapping: mmap.mmap, segments_table_offset: int
+    ) -> Tuple[List[Tuple[int, int, int, int]], int]:
+        """
+        @param fjm_mapping: [in]: the mapped .fjm file.
+        @param segments_table_offset: the offset of the segments table.
+        @return: the segments, and the offset of the data (the end of the segments table).
+        """
+        data_offset = segments_table_offset + self.segment_num * _segment_size
+        if len(fjm_mapping) < data_offset:
+            raise FlipJumpReadFjmException('Error: the file ends in the middle of the segments table.')
+        return list(_segment_struct.iter_unpack(fjm_mapping[segments_table_offset:data_offset])), data_offset
 
     def _validate_header(self) -> None:
         if self.magic != FJ_MAGIC:
@@ -103,69 +137,105 @@ class Reader:
             raise FlipJumpReadFjmException(f'Error: bad reserved value ({self.reserved}, should be 0).')
 
     @staticmethod
-    def _decompress_data(compressed_data: bytes) -> bytes:
+    def _decompress_data(compressed_data: memoryview) -> bytes:
         try:
             return lzma.decompress(compressed_data, format=_LZMA_FORMAT, filters=_LZMA_DECOMPRESSION_FILTERS)
         except lzma.LZMAError as e:
             raise FlipJumpReadFjmException('Error: The compressed data is damaged; Unable to decompress.') from e
 
-    def _read_decompressed_data(self, fjm_file: BinaryIO) -> List[int]:
+    def _read_decompressed_data(self, fjm_mapping: mmap.mmap, data_offset: int) -> "array[int]":
         """
-        @param fjm_file: [in]: read from this file the data words.
-        @return: list of the data words (decompressed if it was compressed).
+        @param fjm_mapping: [in]: the mapped .fjm file, read from it the data words.
+        @param data_offset: the offset of the data in the file.
+        @return: array of the data words (decompressed if it was compressed).
         """
-        read_tag = '<' + {8: 'B', 16: 'H', 32: 'L', 64: 'Q'}[self.memory_width]
         word_bytes_size = self.memory_width // 8
+        data = array(_word_array_typecodes[self.memory_width])
+
+        # the view must be released before the mapping is closed.
+        with memoryview(fjm_mapping)[data_offset:] as file_data:
+            words_data: Union[memoryview, bytes] = file_data
+            if FJMVersion.CompressedVersion == self.version:
+                words_data = self._decompress_data(file_data)
+
+            if len(words_data) % word_bytes_size != 0:
+                raise FlipJumpReadFjmException(
+                    f'Error: the data size ({len(words_data)} bytes) is not a multiple of the word size '
+                    f'({word_bytes_size} bytes).'
+                )
+            data.frombytes(words_data)
 
-        file_data = fjm_file.read()
-        if FJMVersion.CompressedVersion == self.version:
-            file_data = self._decompress_data(file_data)
-
-        data = [
-            unpack(read_tag, file_data[i : i + word_bytes_size])[0]  # noqa: E203
-            for i in range(0, len(file_data), word_bytes_size)
-        ]
+        if sys.byteorder == 'big':
+            data.byteswap()  # the .fjm data is little-endian
         return data
 
-    def _init_memory(self, segments: List[Tuple[int, int, int, int]], data: List[int]) -> None:
-        self.memory = {}
+    def _init_memory(self, segments: List[Tuple[int, int, int, int]], data: "array[int]") -> None:
+        """
+        Every segment's words (its data, and its zeros padding if it's short) are saved in its own array.
+        Words outside these arrays (long zeros paddings or garbage memory) are saved in the sparse_memory dictionary.
+        """
+        self.region_starts = []
+        self.regions = []
+        self.sparse_memory = {}
+        self.op_locations = {}
         self.zeros_boundaries = []
 
-        self.memory_segments = []
-        for segment_start, segment_length, data_start, data_length in segments:
-            self.memory_segments.append(
-                MemorySegment(
-                    segment_start << (self.memory_width.bit_length() - 1),
-                    segment_length << (self.memory_width.bit_length() - 1),
-                )
+        self.memory_segments = [
+            MemorySegment(
+                segment_start << self._word_address_shift,
+                segment_length << self._word_address_shift,
             )
+            for segment_start, segment_length, _, _ in segments
+        ]
+
+        previous_segment_end = 0
+        for segment_start, segment_length, data_start, data_length in sorted(segments):
+            if segment_start < previous_segment_end:
+                raise FlipJumpReadFjmException(f'Error: overlapping segments (at word address {hex(segment_start)}).')
+            previous_segment_end = segment_start + segment_length
+
+            region = data[data_start : data_start + data_length]  # noqa: E203
             if self.version in (FJMVersion.RelativeJumpVersion, FJMVersion.CompressedVersion):
-                word = (1 << self.memory_width) - 1
-                for i in range(0, data_length, 2):
-                    self.memory[segment_start + i] = data[data_start + i]
-                    self.memory[segment_start + i + 1] = (
-                        data[data_start + i + 1] + (segment_start + i + 1) * self.memory_width
-                    ) & word
-            else:
-                for i in range(data_length):
-                    self.memory[segment_start + i] = data[data_start + i]
+                word = self._word_mask
+                jump_addresses = range(
+                    (segment_start + 1) * self.memory_width,
+                    (segment_start + data_length) * self.memory_width,
+                    2 * self.memory_width,
+                )
+                region[1::2] = array(
+                    region.typecode,
+                    [(jump + jump_address) & word for jump, jump_address in zip(region[1::2], jump_addresses)],
+                )
             if segment_length > data_length:
                 if segment_length - data_length < _reserved_dict_threshold:
-                    for i in range(data_length, segment_length):
-                        self.memory[segment_start + i] = 0
+                    region.frombytes(bytes((segment_length - data_length) * region.itemsize))
                 else:
                     self.zeros_boundaries.append((segment_start + data_length, segment_start + segment_length))
 
+            self.region_starts.append(segment_start)
+            self.regions.append(region)
+
+        # the segments are sorted, so the zeros boundaries are sorted too.
+        self.zeros_boundaries_starts = [start for start, _ in self.zeros_boundaries]
+
     def _get_memory_word(self, word_address: int) -> int:
-        word_address &= (1 << self.memory_width) - 1
-        if word_address not in self.memory:
-            for start, end in self.zeros_boundaries:
-                if start <= word_address < end:
-                    self.memory[word_address] = 0
-                    return 0
+        word_address &= self._word_mask
+
+        region_index = bisect_right(self.region_starts, word_address) - 1
+        if region_index >= 0:
+            region = self.regions[region_index]
+            offset = word_address - self.region_starts[region_index]
+            if offset < len(region):
+                return region[offset]
+
+        if word_address not in self.sparse_memory:
+            zeros_index = bisect_right(self.zeros_boundaries_starts, word_address) - 1
+            if zeros_index >= 0 and word_address < self.zeros_boundaries[zeros_index][1]:
+                self.sparse_memory[word_address] = 0
+                return 0
 
             garbage_val = _new_garbage_val()
-            memory_address = word_address << (self.memory_width.bit_length() - 1)
+            memory_address = word_address << self._word_address_shift
             garbage_message = f'Reading garbage word at mem[{hex(memory_address)[2:]}] = {hex(garbage_val)[2:]}'
 
             if GarbageHandling.Stop == self.garbage_handling:
@@ -176,23 +246,23 @@ class Reader:
                 print(f'\nWarning:  {garbage_message}')
                 sleep(0.1)
 
-            self.memory[word_address] = garbage_val
+            self.sparse_memory[word_address] = garbage_val
 
-        return self.memory[word_address]
+        return self.sparse_memory[word_address]
 
     def _set_memory_word(self, word_address: int, value: int) -> None:
-        word_address &= (1 << self.memory_width) - 1
-        value &= (1 << self.memory_width) - 1
-        self.memory[word_address] = value
+        word_address &= self._word_mask
+        value &= self._word_mask
 
-    def _bit_address_decompose(self, bit_address: int) -> Tuple[int, int]:
-        """
-        @param bit_address: the address
-        @return: tuple of the word address and the bit offset
-        """
-        word_address = (bit_address >> (self.memory_width.bit_length() - 1)) & ((1 << self.memory_width) - 1)
-        bit_offset = bit_address & (self.memory_width - 1)
-        return word_address, bit_offset
+        region_index = bisect_right(self.region_starts, word_address) - 1
+        if region_index >= 0:
+            region = self.regions[region_index]
+            offset = word_address - self.region_starts[region_index]
+            if offset < len(region):
+                region[offset] = value
+                return
+
+        self.sparse_memory[word_address] = value
 
     def read_bit(self, bit_address: int) -> bool:
         """
@@ -200,7 +270,8 @@ class Reader:
         @param bit_address: the address
         @return: True/False for 1/0
         """
-        word_address, bit_offset = self._bit_address_decompose(bit_address)
+        word_address = (bit_address >> self._word_address_shift) & self._word_mask
+        bit_offset = bit_address & self._bit_offset_mask
         return (self._get_memory_word(word_address) >> bit_offset) & 1 == 1
 
     def write_bit(self, bit_address: int, bit_value: bool) -> None:
@@ -209,13 +280,28 @@ class Reader:
         @param bit_address: the address
         @param bit_value: True/False for 1/0
         """
-        word_address, bit_offset = self._bit_address_decompose(bit_address)
-        word_value = self._get_memory_word(word_address)
-        if bit_value:
-            word_value |= 1 << bit_offset
-        else:
-            word_value &= (1 << self.memory_width) - 1 - (1 << bit_offset)
-        self._set_memory_word(word_address, word_value)
+        word_address = (bit_address >> self._word_address_shift) & self._word_mask
+        bit_offset = bit_address & self._bit_offset_mask
+        word_value = self._get_memory_word(word_address) & ~(1 << bit_offset)
+        self._set_memory_word(word_address, word_value | (bit_value << bit_offset))
+
+    def flip_bit(self, bit_address: int) -> None:
+        """
+        flip a bit in memory (the same as write_bit(bit_address, not read_bit(bit_address))).
+        @param bit_address: the address
+        """
+        word_address = (bit_address >> self._word_address_shift) & self._word_mask
+        bit_mask = 1 << (bit_address & self._bit_offset_mask)
+
+        region_index = bisect_right(self.region_starts, word_address) - 1
+        if region_index >= 0:
+            region = self.regions[region_index]
+            offset = word_address - self.region_starts[region_index]
+            if offset < len(region):
+                region[offset] ^= bit_mask
+                return
+
+        self._set_memory_word(word_address, self._get_memory_word(word_address) ^ bit_mask)
 
     def get_word(self, bit_address: int) -> int:
         """
@@ -223,15 +309,45 @@ class Reader:
         @param bit_address: the address
         @return: the word value
         """
-        word_address, bit_offset = self._bit_address_decompose(bit_address)
+        bit_offset = bit_address & self._bit_offset_mask
         if bit_offset == 0:
-            return self._get_memory_word(word_address)
-        if word_address == ((1 << self.memory_width) - 1):
+            # an aligned word is a single memory word (_get_memory_word masks its address).
+            return self._get_memory_word(bit_address >> self._word_address_shift)
+
+        word_address = (bit_address >> self._word_address_shift) & self._word_mask
+        if word_address == self._word_mask:
             raise FlipJumpRuntimeMemoryException('Accessed outside of memory (beyond the last bit).', bit_address)
 
         lsw = self._get_memory_word(word_address)
         msw = self._get_memory_word(word_address + 1)
-        return ((lsw >> bit_offset) | (msw << (self.memory_width - bit_offset))) & ((1 << self.memory_width) - 1)
+        return ((lsw >> bit_offset) | (msw << (self.memory_width - bit_offset))) & self._word_mask
+
+    def get_both(self, ip: int) -> Tuple[int, Optional[int]]:
+        """
+        read the two words of the op at ip (its flip word, and its jump word at ip + w).
+        The region location of every aligned op inside a region is cached in op_locations on its first read.
+        The regions are only modified in-place, so a cached location always gives the op's current words.
+        @note the jump word is only read here if the whole op is inside a region (so reading it can't fail,
+         or produce garbage). Otherwise, the caller should read it with get_word(ip + w) after the op's flip.
+        @param ip: the op's address
+        @return: the (flip, jump) words, or (flip, None) if the jump word wasn't read
+        """
+        location = self.op_locations.get(ip)
+        if location is not None:
+            region, offset = location
+            return region[offset], region[offset + 1]
+
+        if ip & self._bit_offset_mask == 0:
+            word_address = (ip >> self._word_address_shift) & self._word_mask
+            region_index = bisect_right(self.region_starts, word_address) - 1
+            if region_index >= 0:
+                region = self.regions[region_index]
+                offset = word_address - self.region_starts[region_index]
+                if offset + 1 < len(region):
+                    self.op_locations[ip] = region, offset
+                    return region[offset], region[offset + 1]
+
+        return self.get_word(ip), None
 
     def get_memory(self) -> Dict[int, int]:
         """
@@ -239,4 +355,7 @@ class Reader:
         Note that it ignores "garbage handling", and it's ment to be used to just read the memory.
         Uninitialized addresses will return zero.
         """
-        return defaultdict(lambda: 0, self.memory)
+        memory = defaultdict(lambda: 0, self.sparse_memory)
+        for region_start, region in zip(self.region_starts, self.regions):
+            memory.update(zip(range(region_start, region_start + len(region)), region))
+        return memory
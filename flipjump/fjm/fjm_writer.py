@@ -1,16 +1,19 @@
 import lzma
+import sys
+from array import array
+from bisect import bisect_left, insort
 from pathlib import Path
-from struct import pack
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from flipjump.fjm.fjm_consts import (
     FJ_MAGIC,
-    _header_base_format,
-    _header_extension_format,
-    _segment_format,
+    _header_base_struct,
+    _header_extension_struct,
+    _segment_struct,
     SUPPORTED_VERSIONS_NAMES,
     _LZMA_FORMAT,
     _lzma_compression_filters,
+    _word_array_typecodes,
     FJMVersion,
 )
 from flipjump.utils.exceptions import FlipJumpWriteFjmException
@@ -68,6 +71,10 @@ class Writer:
         self.segments: List[Tuple[int, int, int, int]] = []
         self.data: List[int] = []  # words array
 
+        # (start, end, segment-index) of the segments' addresses / data ranges, sorted for the overlap validations
+        self._sorted_segment_addresses: List[Tuple[int, int, int]] = []
+        self._sorted_segment_data: List[Tuple[int, int, int]] = []
+
     def _compress_data(self, data: bytes) -> bytes:
         try:
             return lzma.compress(
@@ -85,17 +92,17 @@ class Writer:
             self.write_to_file_text()
             return
 
-        write_tag = '<' + {8: 'B', 16: 'H', 32: 'L', 64: 'Q'}[self.word_size]
-
         with open(self.output_file, 'wb') as f:
-            f.write(pack(_header_base_format, FJ_MAGIC, self.word_size, self.version.value, len(self.segments)))
+            f.write(_header_base_struct.pack(FJ_MAGIC, self.word_size, self.version.value, len(self.segments)))
             if FJMVersion.BaseVersion != self.version:
-                f.write(pack(_header_extension_format, self.flags, self.reserved))
+                f.write(_header_extension_struct.pack(self.flags, self.reserved))
 
-            for segment in self.segments:
-                f.write(pack(_segment_format, *segment))
+            f.write(b''.join(_segment_struct.pack(*segment) for segment in self.segments))
 
-            fjm_data = b''.join(pack(write_tag, word) for word in self.data)
+            data_words = array(_word_array_typecodes[self.word_size], self.data)
+            if sys.byteorder == 'big':
+                data_words.byteswap()  # the .fjm data is little-endian
+            fjm_data = data_words.tobytes()
             if FJMVersion.CompressedVersion == self.version:
                 fjm_data = self._compress_data(fjm_data)
 
@@ -131,44 +138,51 @@ class Writer:
         )
 
     @staticmethod
-    def _is_collision(start1: int, end1: int, start2: int, end2: int) -> bool:
-        if any(start2 <= address <= end2 for address in (start1, end1)):
-            return True
-        if any(start1 <= address <= end1 for address in (start2, end2)):
-            return True
-        return False
+    def _find_overlapping_segment(sorted_ranges: List[Tuple[int, int, int]], start: int, end: int) -> Optional[int]:
+        """
+        @param sorted_ranges: [in]: sorted, non-overlapping (start, end, segment-index) ranges (end is exclusive)
+        @param start: the new range's start
+        @param end: the new range's (exclusive) end
+        @return: the smallest segment-index of a range that overlaps [start, end), or None if there isn't one
+        """
+        i = bisect_left(sorted_ranges, (start,))
+        if i > 0 and sorted_ranges[i - 1][1] > start:
+            i -= 1
+
+        overlapping_indices = []
+        while i < len(sorted_ranges) and sorted_ranges[i][0] < end:
+            overlapping_indices.append(sorted_ranges[i][2])
+            i += 1
+        return min(overlapping_indices, default=None)
 
     def _validate_segment_addresses_not_overlapping(self, new_segment_start: int, new_segment_length: int) -> None:
-        new_segment_end = new_segment_start + new_segment_length - 1
-        for i, (segment_start, segment_length, _, _) in enumerate(self.segments):
-            segment_end = segment_start + segment_length - 1
-
-            if self._is_collision(segment_start, segment_end, new_segment_start, new_segment_end):
-                raise FlipJumpWriteFjmException(
-                    f"Overlapping segments addresses: "
-                    f"seg[{i}]={self.get_segment_addresses_repr(segment_start, segment_length)}"
-                    f" and "
-                    f"seg[{len(self.segments)}]="
-                    f"{self.get_segment_addresses_repr(new_segment_start, new_segment_length)}"
-                )
+        i = self._find_overlapping_segment(
+            self._sorted_segment_addresses, new_segment_start, new_segment_start + new_segment_length
+        )
+        if i is not None:
+            segment_start, segment_length, _, _ = self.segments[i]
+            raise FlipJumpWriteFjmException(
+                f"Overlapping segments addresses: "
+                f"seg[{i}]={self.get_segment_addresses_repr(segment_start, segment_length)}"
+                f" and "
+                f"seg[{len(self.segments)}]="
+                f"{self.get_segment_addresses_repr(new_segment_start, new_segment_length)}"
+            )
 
     def _validate_segment_data_not_overlapping(self, new_data_start: int, new_data_length: int) -> None:
         if new_data_length == 0:
             return
-        new_data_end = new_data_start + new_data_length - 1
-
-        for i, (_, _, data_start, data_length) in enumerate(self.segments):
-            if data_length == 0:
-                continue
-            data_end = data_start + data_length - 1
+        new_data_end = new_data_start + new_data_length
 
-            if self._is_collision(data_start, data_end, new_data_start, new_data_end):
-                raise FlipJumpWriteFjmException(
-                    f"Overlapping segments data: "
-                    f"seg[{i}]=data[{hex(data_start)}, {hex(data_end + 1)})"
-                    f" and "
-                    f"seg[{len(self.segments)}]=data[{hex(new_data_start)}, {hex(new_data_end + 1)})"
-                )
+        i = self._find_overlapping_segment(self._sorted_segment_data, new_data_start, new_data_end)
+        if i is not None:
+            _, _, data_start, data_length = self.segments[i]
+            raise FlipJumpWriteFjmException(
+                f"Overlapping segments data: "
+                f"seg[{i}]=data[{hex(data_start)}, {hex(data_start + data_length)})"
+                f" and "
+                f"seg[{len(self.segments)}]=data[{hex(new_data_start)}, {hex(new_data_end)})"
+            )
 
     def _validate_segment_not_overlapping(
         self, segment_start: int, segment_length: int, data_start: int, data_length: int
@@ -192,7 +206,9 @@ class Writer:
         @param data_start: the index of the data's start in the inner data array
         @param data_length: the number of words in the segment's data
         """
-        segment_addresses_str = f'seg[{self.segments}]={self.get_segment_addresses_repr(segment_start, segment_length)}'
+        segment_addresses_str = (
+            f'seg[{len(self.segments)}]={self.get_segment_addresses_repr(segment_start, segment_length)}'
+        )
 
         if segment_length <= 0:
             raise FlipJumpWriteFjmException(f"segment-length must be positive (in {segment_addresses_str}).")
@@ -213,7 +229,11 @@ class Writer:
         if self.version in (FJMVersion.RelativeJumpVersion, FJMVersion.CompressedVersion):
             self._update_to_relative_jumps(segment_start, data_start, data_length)
 
+        segment_index = len(self.segments)
         self.segments.append((segment_start, segment_length, data_start, data_length))
+        insort(self._sorted_segment_addresses, (segment_start, segment_start + segment_length, segment_index))
+        if data_length > 0:
+            insort(self._sorted_segment_data, (data_start, data_start + data_length, segment_index))
 
     def add_data(self, data: List[int]) -> int:
         """
@@ -222,7 +242,7 @@ class Writer:
         @return: the data start index
         """
         data_start = len(self.data)
-        self.data += data
+        self.data.extend(data)
         return data_start
 
     def add_simple_segment_with_data(self, segment_start: int, data: List[int]) -> None:
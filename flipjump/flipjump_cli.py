@@ -84,7 +84,7 @@ def run(in_fjm_path: Path, debug_file: Optional[Path], args: argparse.Namespace,
         breakpoints_addresses=set(),
         breakpoints=set(args.breakpoint),
         breakpoints_contains=set(args.breakpoint_contains),
-        io_device=StandardIO(not args.no_output),
+        io_device=StandardIO(not args.no_output, flush_every_byte=args.trace),
         show_trace=args.trace,
         print_time=not args.silent,
         print_termination=not args.silent,
@@ -132,7 +132,7 @@ def debug(
     :note: This is a wrapper function to the fjm_run.run() function.
     """
     if io_device is None:
-        io_device = StandardIO(True)
+        io_device = StandardIO(True, flush_every_byte=show_trace)
 
     breakpoint_handler = get_breakpoint_handler(
         debugging_file, breakpoints_addresses, breakpoints, breakpoints_contains
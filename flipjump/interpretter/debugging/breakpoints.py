@@ -1,6 +1,7 @@
 import re
+from bisect import bisect_right
 from pathlib import Path
-from typing import Optional, Dict, Set, Tuple
+from typing import Optional, Dict, Set, Tuple, List
 
 from flipjump.fjm import fjm_reader
 from flipjump.interpretter.debugging.message_boxes import (
@@ -162,6 +163,9 @@ class BreakpointHandler:
 
         self.next_break: Optional[int] = None  # will break(point) when the number of executed ops reaches this number.
 
+        # the sorted labels addresses, for finding the closest previous label (created on first use).
+        self._sorted_label_addresses: Optional[List[int]] = None
+
     def should_break(self, ip: int, op_counter: int) -> bool:
         return self.next_break == op_counter or ip in self.breakpoints
 
@@ -179,12 +183,15 @@ class BreakpointHandler:
             label_repr = get_nice_label_repr(self.address_to_label[address], pad=4)
             return f'{hex(address)}:\n{label_repr}'
         else:
-            try:
-                address_before = max(a for a in self.address_to_label if a <= address)
-                label_repr = get_nice_label_repr(self.address_to_label[address_before], pad=4)
-                return f'{hex(address)} ({hex(address - address_before)} bits after:)\n{label_repr}'
-            except ValueError:
+            if self._sorted_label_addresses is None:
+                self._sorted_label_addresses = sorted(self.address_to_label)
+
+            address_before_index = bisect_right(self._sorted_label_addresses, address) - 1
+            if address_before_index < 0:
                 return f'{hex(address)}'
+            address_before = self._sorted_label_addresses[address_before_index]
+            label_repr = get_nice_label_repr(self.address_to_label[address_before], pad=4)
+            return f'{hex(address)} ({hex(address - address_before)} bits after:)\n{label_repr}'
 
     def get_message_box_body(self, ip: int, mem: fjm_reader.Reader, op_counter: int) -> str:
         """
@@ -97,45 +97,6 @@ class TerminationStatistics:
         )
 
 
-def _handle_input(io_device: IODevice, ip: int, mem: fjm_reader.Reader, statistics: RunStatistics) -> None:
-    """
-    if the ip is in the input-bit range, read a bit from the io_device into the memory.
-    """
-    w = mem.memory_width
-    in_addr = 3 * w + w.bit_length()  # 3w + #w
-
-    if ip <= in_addr < ip + 2 * w:
-        with statistics.pause_timer:
-            input_bit = io_device.read_bit()
-        mem.write_bit(in_addr, input_bit)
-
-
-def _handle_output(flip_address: int, io_device: IODevice, w: int) -> None:
-    """
-    if the ip is in the output-bit range, output the corresponding bit to the io_device.
-    """
-    out_addr = 2 * w
-    if out_addr <= flip_address <= out_addr + 1:
-        io_device.write_bit(out_addr + 1 == flip_address)
-
-
-def _trace_jump(jump_address: int, show_trace: bool) -> None:
-    """
-    if show_trace is enabled, print the current jump-address.
-    """
-    if show_trace:
-        print(hex(jump_address)[2:])
-
-
-def _trace_flip(ip: int, flip_address: int, show_trace: bool) -> None:
-    """
-    if show_trace is enabled, print the current ip-address and flip-address.
-    """
-    if show_trace:
-        print(hex(ip)[2:].rjust(7), end=':   ')
-        print(hex(flip_address)[2:], end='; ', flush=True)
-
-
 def run(
     fjm_path: Path,
     *,
@@ -163,45 +124,124 @@ def run(
 
     ip = 0
     w = mem.memory_width
+    op_size = 2 * w
+    out_addr_0 = 2 * w  # flipping this bit outputs 0
+    out_addr_1 = out_addr_0 + 1  # flipping this bit outputs 1
+    in_addr = 3 * w + w.bit_length()  # 3w + #w
+    # the input bit is inside the op at ip  <==>  ip <= in_addr < ip + op_size  <==>  first_input_ip <= ip <= in_addr
+    first_input_ip = in_addr - op_size + 1
 
     statistics = RunStatistics(w, last_ops_debugging_list_length)
 
+    # the loop below runs for every executed op, so bind its methods to locals once.
+    get_word = mem.get_word
+    get_both = mem.get_both
+    flip_bit = mem.flip_bit
+    write_bit = mem.write_bit
+    io_read_bit = io_device.read_bit
+    io_write_bit = io_device.write_bit
+    register_op_address = statistics.register_op_address
+    register_op = statistics.register_op
+    pause_timer = statistics.pause_timer
+
     try:
-        while True:
-            statistics.register_op_address(ip)
+        # debugging / tracing loop. runs while there are breakpoints to check or ops to trace.
+        while breakpoint_handler is not None or show_trace:
+            register_op_address(ip)
 
             # handle breakpoints
             if breakpoint_handler and breakpoint_handler.should_break(ip, statistics.op_counter):
                 breakpoint_handler = handle_breakpoint(breakpoint_handler, ip, mem, statistics)
 
-            # read flip word
-            flip_address = mem.get_word(ip)
-            _trace_flip(ip, flip_address, show_trace)
-
-            # handle IO
-            _handle_output(flip_address, io_device, w)
-            try:
-                _handle_input(io_device, ip, mem, statistics)
-            except IOReadOnEOF:
-                return TerminationStatistics(statistics, TerminationCause.EOF)
+            # read the flip word (and the jump word, if it can be read before the flip)
+            flip_address, jump_address = get_both(ip)
+            if show_trace:
+                # not flushed: StandardIO flushes stdout before printing the program's output or reading input.
+                print(f'{ip:7x}:   {flip_address:x}', end='; ')
+
+            # handle output: if the flip address is one of the output bits, output the corresponding bit.
+            if out_addr_0 <= flip_address <= out_addr_1:
+                io_write_bit(out_addr_1 == flip_address)
+
+            # handle input: if the input bit is in the current op, read a bit from the io_device into it.
+            if first_input_ip <= ip <= in_addr:
+                try:
+                    with pause_timer:
+                        input_bit = io_read_bit()
+                except IOReadOnEOF:
+                    return TerminationStatistics(statistics, TerminationCause.EOF)
+                write_bit(in_addr, input_bit)
+                if ip + w <= in_addr:  # the input bit is in the jump word
+                    jump_address = None
 
             # FLIP!
-            mem.write_bit(flip_address, not mem.read_bit(flip_address))
+            flip_bit(flip_address)
+
+            # read the jump word, if it wasn't read yet, or if the op flipped its own jump word
+            if jump_address is None or ip + w <= flip_address < ip + op_size:
+                jump_address = get_word(ip + w)
 
-            # read jump word
-            jump_address = mem.get_word(ip + w)
-            _trace_jump(jump_address, show_trace)
-            statistics.register_op(ip, flip_address, jump_address)
+            if show_trace:
+                print(f'{jump_address:x}')
+            register_op(ip, flip_address, jump_address)
 
             # check finish?
-            if jump_address == ip and not ip <= flip_address < ip + 2 * w:
+            if jump_address == ip and not ip <= flip_address < ip + op_size:
                 return TerminationStatistics(statistics, TerminationCause.Looping)
-            if jump_address < 2 * w:
+            if jump_address < op_size:
                 return TerminationStatistics(statistics, TerminationCause.NullIP)
 
             # JUMP!
             ip = jump_address
 
+        # the same loop, without the breakpoints and trace checks.
+        # its op counters are kept in locals, and are added to the statistics when it ends.
+        op_counter = flip_counter = jump_counter = 0
+        try:
+            while True:
+                register_op_address(ip)
+
+                flip_address, jump_address = get_both(ip)
+
+                if out_addr_0 <= flip_address <= out_addr_1:
+                    io_write_bit(out_addr_1 == flip_address)
+
+                if first_input_ip <= ip <= in_addr:
+                    try:
+                        with pause_timer:
+                            input_bit = io_read_bit()
+                    except IOReadOnEOF:
+                        termination_cause = TerminationCause.EOF
+                        break
+                    write_bit(in_addr, input_bit)
+                    if ip + w <= in_addr:
+                        jump_address = None
+
+                flip_bit(flip_address)
+                if jump_address is None or ip + w <= flip_address < ip + op_size:
+                    jump_address = get_word(ip + w)
+
+                op_counter += 1
+                if flip_address >= op_size:
+                    flip_counter += 1
+                if jump_address != ip + op_size:
+                    jump_counter += 1
+
+                if jump_address == ip and not ip <= flip_address < ip + op_size:
+                    termination_cause = TerminationCause.Looping
+                    break
+                if jump_address < op_size:
+                    termination_cause = TerminationCause.NullIP
+                    break
+
+                ip = jump_address
+        finally:
+            statistics.op_counter += op_counter
+            statistics.flip_counter += flip_counter
+            statistics.jump_counter += jump_counter
+
+        return TerminationStatistics(statistics, termination_cause)
+
     except FlipJumpRuntimeMemoryException as mem_e:
         return TerminationStatistics(
             statistics, TerminationCause.RuntimeMemoryError, memory_error_address=mem_e.memory_address
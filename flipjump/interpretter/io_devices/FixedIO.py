@@ -1,3 +1,5 @@
+from io import BytesIO
+
 from flipjump.interpretter.io_devices.IODevice import IODevice
 from flipjump.utils.exceptions import IOReadOnEOF, IncompleteOutput
 
@@ -8,8 +10,8 @@ class FixedIO(IODevice):
     """
 
     def __init__(self, _input: bytes):
-        self.remaining_input = _input
-        self._output = b''
+        self._input = BytesIO(_input)
+        self._output = bytearray()
 
         self.current_input_byte = 0
         self.bits_to_read_in_input_byte = 0
@@ -17,13 +19,25 @@ class FixedIO(IODevice):
         self.current_output_byte = 0
         self.bits_to_write_in_output_byte = 0
 
+    @property
+    def remaining_input(self) -> bytes:
+        """
+        @return: the input bytes that weren't read yet
+        """
+        return self._input.getvalue()[self._input.tell() :]  # noqa: E203
+
+    def _read_input_byte(self) -> int:
+        read_bytes = self._input.read(1)
+        if not read_bytes:
+            raise IOReadOnEOF("Read an empty input on fixed IO (EOF)")
+        return read_bytes[0]
+
+    def _write_output_byte(self, byte: int) -> None:
+        self._output.append(byte)
+
     def read_bit(self) -> bool:
         if 0 == self.bits_to_read_in_input_byte:
-            if not self.remaining_input:
-                raise IOReadOnEOF("Read an empty input on fixed IO (EOF)")
-
-            self.current_input_byte = self.remaining_input[0]
-            self.remaining_input = self.remaining_input[1:]
+            self.current_input_byte = self._read_input_byte()
             self.bits_to_read_in_input_byte = 8
 
         bit = (self.current_input_byte & 1) == 1
@@ -36,7 +50,7 @@ class FixedIO(IODevice):
         self.bits_to_write_in_output_byte += 1
 
         if 8 == self.bits_to_write_in_output_byte:
-            self._output += self.current_output_byte.to_bytes(1, 'little')
+            self._write_output_byte(self.current_output_byte)
             self.current_output_byte = 0
             self.bits_to_write_in_output_byte = 0
 
@@ -50,4 +64,4 @@ class FixedIO(IODevice):
                 "tries to get output when an unaligned number of bits was outputted " "(doesn't divide 8)"
             )
 
-        return self._output
+        return bytes(self._output)
@@ -2,7 +2,6 @@ from sys import stdin, stdout
 
 from flipjump.interpretter.io_devices.IODevice import IODevice
 from flipjump.utils.exceptions import IOReadOnEOF, IncompleteOutput
-from flipjump.utils.constants import IO_BYTES_ENCODING
 
 
 class StandardIO(IODevice):
@@ -10,12 +9,21 @@ class StandardIO(IODevice):
     read from stdin, write to stdout
     """
 
-    def __init__(self, output_verbose: bool):
+    # flush the printed output once it gets this big (it's also flushed before reading input,
+    # and on newlines if stdout is a terminal).
+    STDOUT_BUFFER_SIZE = 4096
+
+    def __init__(self, output_verbose: bool, *, flush_every_byte: bool = False):
         """
         @param output_verbose: if true print program's output
+        @param flush_every_byte: if true print every output byte as soon as it's written (e.g. so that the output
+         is printed next to the trace lines of the ops that wrote it)
         """
         self.output_verbose = output_verbose
-        self._output = b''
+        self._output = bytearray()
+        self._stdout_buffer = bytearray()
+        self._flush_on_newline = output_verbose and stdout.isatty()
+        self._flush_every_byte = flush_every_byte
 
         self.current_input_byte = 0
         self.bits_to_read_in_input_byte = 0
@@ -23,13 +31,37 @@ class StandardIO(IODevice):
         self.current_output_byte = 0
         self.bits_to_write_in_output_byte = 0
 
+    def _flush_stdout(self) -> None:
+        """
+        write the buffered output bytes to stdout.
+        """
+        stdout.flush()  # keep the order with anything printed to stdout as text (e.g. the trace)
+        if self._stdout_buffer:
+            stdout.buffer.write(self._stdout_buffer)
+            stdout.buffer.flush()
+            self._stdout_buffer.clear()
+
+    def _read_input_byte(self) -> int:
+        self._flush_stdout()
+        read_bytes = stdin.buffer.read(1)
+        if 0 == len(read_bytes):
+            raise IOReadOnEOF("Read an empty input on standard IO (EOF)")
+        return read_bytes[0]
+
+    def _write_output_byte(self, byte: int) -> None:
+        if self.output_verbose:
+            self._stdout_buffer.append(byte)
+            if (
+                self._flush_every_byte
+                or (self._flush_on_newline and byte == ord('\n'))
+                or len(self._stdout_buffer) >= self.STDOUT_BUFFER_SIZE
+            ):
+                self._flush_stdout()
+        self._output.append(byte)
+
     def read_bit(self) -> bool:
         if 0 == self.bits_to_read_in_input_byte:
-            read_bytes = stdin.read(1).encode(encoding=IO_BYTES_ENCODING)
-            if 0 == len(read_bytes):
-                raise IOReadOnEOF("Read an empty input on standard IO (EOF)")
-
-            self.current_input_byte = read_bytes[0]
+            self.current_input_byte = self._read_input_byte()
             self.bits_to_read_in_input_byte = 8
 
         bit = (self.current_input_byte & 1) == 1
@@ -42,18 +74,18 @@ class StandardIO(IODevice):
         self.bits_to_write_in_output_byte += 1
 
         if 8 == self.bits_to_write_in_output_byte:
-            curr_output: bytes = self.current_output_byte.to_bytes(1, 'little')
-            if self.output_verbose:
-                stdout.write(curr_output.decode(encoding=IO_BYTES_ENCODING))
-                stdout.flush()
-            self._output += curr_output
+            self._write_output_byte(self.current_output_byte)
             self.current_output_byte = 0
             self.bits_to_write_in_output_byte = 0
 
     def get_output(self, *, allow_incomplete_output: bool = False) -> bytes:
+        self._flush_stdout()
         if not allow_incomplete_output and 0 != self.bits_to_write_in_output_byte:
             raise IncompleteOutput(
                 "tries to get output when an unaligned number of bits was outputted " "(doesn't divide 8)"
             )
 
-        return self._output
+        return bytes(self._output)
+
+    def __del__(self) -> None:
+        self._flush_stdout()